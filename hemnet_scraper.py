@@ -0,0 +1,406 @@
+import asyncio
+import httpx
+import logging
+from selectolax.lexbor import LexborHTMLParser
+import csv
+from dataclasses import dataclass
+from typing import Callable
+import hashlib
+import math
+import os
+import time
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+log = logging.getLogger(__name__)
+
+_RE_INT = re.compile(r'\d+')
+_RE_NUM = re.compile(r"[\d.,]+")
+# The hit count in the result header, as "av 1 234" or "1 234 bostäder"
+_RE_RESULT_COUNT = re.compile(r'\bav\s+(\d[\d\s]*\d|\d)|(\d[\d\s]*\d|\d)\s+(?:bostäder|slutpriser)')
+
+# Swedish months keyed by their first three letters, which covers both the
+# full names and the abbreviations Hemnet uses ("sep.", "okt.")
+_SV_MONTHS = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'maj': 5, 'jun': 6,
+              'jul': 7, 'aug': 8, 'sep': 9, 'okt': 10, 'nov': 11, 'dec': 12}
+
+BASE_URL = 'https://www.hemnet.se'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+# CSS selectors shared by the for-sale and sold result pages
+SEL_CARD = 'a.hcl-card'
+SEL_ADDRESS = 'h2.hcl-card__title'
+SEL_LOCATION = 'div.Location_address___eOo4'
+SEL_FEATURE = 'span.Label_hclLabelFeature__1_H8e'
+SEL_RESULT_COUNT = '[class*="ResultHeader"]'  # Total number of hits for the search
+
+CONCURRENCY = 16  # Maximum number of page requests in flight at once
+REQUEST_RATE = 4.0  # Page requests started per second once the initial burst of CONCURRENCY is spent
+MAX_PAGES = 50  # Upper bound on pages requested, whatever the hit count says
+MAX_RETRIES = 8
+BACKOFF_FACTOR = 0.8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUEST_TIMEOUT = 30  # Seconds
+# Raw pages are cached on disk so re-runs while tuning the parser skip the network
+CACHE_DIR = 'hemnet_http_cache'
+CACHE_EXPIRE_AFTER = 24 * 60 * 60  # Seconds
+
+class _DigitFilter(dict):
+    # str.translate table keeping decimal digits and deleting everything else,
+    # filled in lazily so only code points actually seen are stored
+    def __missing__(self, code):
+        self[code] = code if chr(code).isdecimal() else None
+        return self[code]
+
+_DIGITS = _DigitFilter()
+
+def _digits(value):
+    return value.translate(_DIGITS)
+
+def find_text(node, selector):
+    found = node.css_first(selector)
+    return found.text().strip() if found else None
+
+def _sanitize_int(value_str, description):
+    if value_str:
+        try:
+            return int(_digits(value_str))
+        except ValueError:
+            log.debug("Could not convert %s to integer: %s", description, value_str)
+    return None
+
+def _sanitize_float(value_str, description):
+    if value_str:
+        # Try to extract the number part and ignore unexpected characters
+        try:
+            return float(_RE_NUM.search(value_str).group().replace(',', '.'))
+        except (ValueError, AttributeError):
+            log.debug("Could not sanitize %s: %s", description, value_str)
+    return None
+
+def sanitize_price(price_str):
+    return _sanitize_int(price_str, 'price')
+
+def sanitize_price_change(price_change_str):
+    return _sanitize_int(price_change_str, 'price change')
+
+def sanitize_price_per_sqm(price_per_sqm_str):
+    return _sanitize_int(price_per_sqm_str, 'price per sqm')
+
+def sanitize_fee(fee_str):
+    return _sanitize_int(fee_str, 'monthly fee')
+
+def sanitize_size(size_str):
+    return _sanitize_float(size_str, 'size')
+
+def sanitize_rooms(rooms_str):
+    return _sanitize_float(rooms_str, 'rooms')
+
+def sanitize_floor(floor_str):
+    if floor_str:
+        match = _RE_INT.search(floor_str)
+        if match:
+            return int(match.group())
+    return 1  # Default to 1 if no floor information is provided
+
+def sanitize_address(address_str):
+    if address_str:
+        return address_str.split(',', 1)[0].strip() or None
+    return None
+
+def sanitize_link(href):
+    return urljoin(BASE_URL, href or '')
+
+def is_present(value):
+    return value is not None
+
+def has_feature(feature, features):
+    return feature in features
+
+def parse_swedish_date(date_str):
+    if not date_str:
+        return None
+    # Remove "Såld " from the beginning of the string
+    parts = date_str.replace("Såld ", "").split()
+    try:
+        day = int(parts[0])
+        month = _SV_MONTHS[parts[1][:3].lower()]
+        # Listings sold this year may leave the year out
+        year = int(parts[2]) if len(parts) > 2 else datetime.now().year
+        # Format the date as YYYY-MM-DD
+        return datetime(year, month, day).strftime('%Y-%m-%d')
+    except (IndexError, KeyError, ValueError):
+        log.debug("Could not parse sale date: %s", date_str)
+        return None
+
+@dataclass(frozen=True, slots=True)
+class Field:
+    # One output column and where to find it on a result card
+    name: str
+    # Prices fit in int32 and sizes in float32, so the Parquet output uses the
+    # narrow types rather than the int64/float64 pyarrow would infer
+    type: pa.DataType
+    selector: str | None = None  # None reads the card element itself
+    sanitizer: Callable | None = None
+    index: int | None = 0  # Which match to read; None collects the texts of every match into a set
+    attribute: str | None = None  # Read this attribute instead of the text
+    required: Callable | None = None  # Cards where this returns false for the value are skipped
+    scraped: bool = True  # False for columns filled in after scraping, or left empty
+
+@dataclass(frozen=True, slots=True)
+class Schema:
+    fields: tuple[Field, ...]
+    # Called with the merged columns to fill in fields that are not scraped
+    finalize: Callable | None = None
+
+    @property
+    def arrow_schema(self):
+        return pa.schema([(field.name, field.type) for field in self.fields])
+
+# Scraped listings are held as a plain dict of column lists keyed by field
+# name in schema order, so one layout serves every schema
+def empty_listings(fields):
+    return {field.name: [] for field in fields}
+
+def count_listings(listings):
+    return len(next(iter(listings.values()), ()))
+
+def retry_delay(retry_after, attempt):
+    # Prefer the server's Retry-After, otherwise back off exponentially
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return BACKOFF_FACTOR * 2 ** attempt
+
+def header_seconds(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    # Token bucket shared by all tasks: up to capacity requests start at once,
+    # then tokens refill at rate per second. Retry-After, or an exhausted
+    # RateLimit-Remaining with its RateLimit-Reset, pauses every task and
+    # empties the bucket so requests resume at the refill rate, not in a burst
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        while True:
+            # Take a token or work out how long until one is due, then sleep without the lock
+            async with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds):
+        until = time.monotonic() + seconds
+        if until > self.paused_until:
+            self.paused_until = until
+            self.tokens = 0
+            self.updated = until
+
+    def update(self, headers):
+        retry_after = header_seconds(headers.get('Retry-After'))
+        if retry_after is not None:
+            self.pause(retry_after)
+        if headers.get('RateLimit-Remaining', '').strip() == '0':
+            reset = header_seconds(headers.get('RateLimit-Reset'))
+            if reset is not None:
+                self.pause(reset)
+
+def cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.html')
+
+def read_cache(url):
+    path = cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_EXPIRE_AFTER:
+            with open(path, 'rb') as cachefile:
+                return cachefile.read()
+    except OSError:
+        pass
+    return None
+
+def write_cache(url, body):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(url)
+    # Write to a temporary file first so an interrupted run never leaves a truncated page behind
+    with open(path + '.tmp', 'wb') as cachefile:
+        cachefile.write(body)
+    os.replace(path + '.tmp', path)
+
+async def fetch_page(client, semaphore, limiter, url, page):
+    page_url = f"{url}&page={page}"
+    body = read_cache(page_url)
+    if body is not None:
+        return body
+    async with semaphore:
+        for attempt in range(MAX_RETRIES + 1):
+            retry_after = None
+            await limiter.wait()
+            try:
+                response = await client.get(page_url)
+                limiter.update(response.headers)
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    write_cache(page_url, response.content)
+                    return response.content
+                # Rate limited or a transient server error: hold the slot and retry
+                retry_after = response.headers.get('Retry-After')
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+            await asyncio.sleep(retry_delay(retry_after, attempt))
+
+def has_listings(body):
+    return LexborHTMLParser(body).css_first(SEL_CARD) is not None
+
+def count_pages(body):
+    tree = LexborHTMLParser(body)
+    per_page = len(tree.css(SEL_CARD))
+    if not per_page:
+        return 1
+    match = _RE_RESULT_COUNT.search(find_text(tree, SEL_RESULT_COUNT) or '')
+    if not match:
+        # No usable hit count on the page; fall back to probing every page
+        return MAX_PAGES
+    total = int(_digits(match.group(1) or match.group(2)))
+    return min(math.ceil(total / per_page), MAX_PAGES)
+
+async def fetch_pages(url):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    limiter = RateLimiter(REQUEST_RATE, CONCURRENCY)
+    # HTTP/2 multiplexes the page requests over a shared keep-alive connection
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+    async with httpx.AsyncClient(http2=True, follow_redirects=True, headers=HEADERS, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        # The first page tells us how many pages there are, so fetch it on its own
+        try:
+            first_page = await fetch_page(client, semaphore, limiter, url, 1)
+        except Exception as e:
+            return [e]
+        tasks = [fetch_page(client, semaphore, limiter, url, page) for page in range(2, count_pages(first_page) + 1)]
+        pages = [first_page, *await asyncio.gather(*tasks, return_exceptions=True)]
+        # The count is only an estimate, so keep going until a page comes back empty
+        while len(pages) < MAX_PAGES and not isinstance(pages[-1], Exception) and has_listings(pages[-1]):
+            try:
+                pages.append(await fetch_page(client, semaphore, limiter, url, len(pages) + 1))
+            except Exception as e:
+                pages.append(e)
+        return pages
+
+def read_field(card, field, matches):
+    if field.selector is None:
+        nodes = [card]
+    else:
+        if field.selector not in matches:
+            matches[field.selector] = card.css(field.selector)
+        nodes = matches[field.selector]
+
+    if field.index is None:
+        # Flag fields such as has_elevator and has_balcony share one label set
+        key = (field.selector, field.attribute)
+        if key not in matches:
+            matches[key] = {read_node(node, field.attribute) for node in nodes}
+        value = matches[key]
+    elif field.index < len(nodes):
+        value = read_node(nodes[field.index], field.attribute)
+    else:
+        value = None
+    return field.sanitizer(value) if field.sanitizer else value
+
+def read_node(node, attribute):
+    if attribute:
+        return node.attributes.get(attribute)
+    return node.text().strip()
+
+def parse_page(body, fields):
+    listings = empty_listings(fields)
+    skipped_listings = 0
+    tree = LexborHTMLParser(body)
+    for card in tree.css(SEL_CARD):
+        # Several fields often share a selector, so each one is queried once per card
+        matches = {}
+        row = [read_field(card, field, matches) if field.scraped else None for field in fields]
+        if not all(field.required(value) for field, value in zip(fields, row) if field.required):
+            skipped_listings += 1
+            continue
+        for column, value in zip(listings.values(), row):
+            column.append(value)
+    return listings, skipped_listings
+
+def configure_logging():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # httpx logs every request at INFO; keep only its warnings
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+# Scripts calling scrape() must guard their entry point with
+# if __name__ == '__main__' so ProcessPoolExecutor workers can import them
+def scrape(url, schema):
+    listings = empty_listings(schema.fields)
+    skipped_listings = 0
+    pages = asyncio.run(fetch_pages(url))
+    # Parsing is CPU bound, so spread the fetched pages over all cores
+    with ProcessPoolExecutor() as executor:
+        results = [body if isinstance(body, Exception) else executor.submit(parse_page, body, schema.fields) for body in pages]
+        for page, result in enumerate(results, start=1):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                page_listings, page_skipped = result.result()
+                if not count_listings(page_listings) and not page_skipped:
+                    log.info("No more listings found. Ending scraping.")
+                    break
+                for name, column in listings.items():
+                    column.extend(page_listings[name])
+                skipped_listings += page_skipped
+                log.info("Scraped page %d, %d listings collected and %d skipped so far", page, count_listings(listings), skipped_listings)
+
+            except Exception as e:
+                # Skip a page that still fails after retrying rather than lose the rest
+                log.error("Error scraping page %d: %s", page, e)
+
+    if schema.finalize:
+        schema.finalize(listings)
+
+    log.info("Scraping completed. Total listings collected: %d, skipped: %d", count_listings(listings), skipped_listings)
+    return listings
+
+def save_to_csv(listings, filename):
+    if not count_listings(listings):
+        log.warning("No listings to save.")
+        return
+
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(listings)
+        writer.writerows(zip(*listings.values()))
+
+def save_to_parquet(listings, schema, filename):
+    if not count_listings(listings):
+        log.warning("No listings to save.")
+        return
+
+    table = pa.table(listings, schema=schema.arrow_schema)
+    pq.write_table(table, filename, compression='zstd')